@@ -12,8 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent import futures
 import datetime
-import io
+import functools
+import operator
 import os
 import re
 import subprocess
@@ -24,7 +26,6 @@ import time
 import unittest
 from unittest import mock
 from xml.etree import ElementTree
-from xml.parsers import expat
 
 from absl import logging
 from absl.testing import _bazelize_command
@@ -33,10 +34,24 @@ from absl.testing import parameterized
 from absl.testing import xml_reporter
 
 
-class StringIOWriteLn(io.StringIO):
+class _ListStream(object):
+  """Minimal text stream that keeps writes in a list until read back."""
 
-  def writeln(self, line):
-    self.write(line + '\n')
+  def __init__(self):
+    self._parts = []
+
+  def write(self, s):
+    self._parts.append(s)
+
+  def writeln(self, line=''):
+    self._parts.append(line)
+    self._parts.append('\n')
+
+  def flush(self):
+    pass
+
+  def getvalue(self):
+    return ''.join(self._parts)
 
 
 class MockTest(absltest.TestCase):
@@ -56,103 +71,204 @@ class MockTest(absltest.TestCase):
     return "This is this test's description."
 
 
-# str(exception_type) is different between Python 2 and 3.
-def xml_escaped_exception_type(exception_type):
-  return xml_reporter._escape_xml_attr(str(exception_type))
-
-
-# Matches the entire XML output. Captures all <testcase> tags except for the
-# last closing </testcase> in a single group.
-OUTPUT_STRING = """\
-<\\?xml version="1.0"\\?>
-<testsuites name="" tests="%(tests)d" failures="%(failures)d"\
- errors="%(errors)d" time="%(run_time).3f" timestamp="%(start_time)s">
-<testsuite name="%(suite_name)s" tests="%(tests)d"\
- failures="%(failures)d" errors="%(errors)d" time="%(run_time).3f"\
- timestamp="%(start_time)s">
-(  <testcase .*)
-  </testcase>
-</testsuite>
-</testsuites>"""
-
-# Matches a single <testcase> tag and its contents, without the closing
-# </testcase>, which we use as a separator to split multiple <testcase> tags.
-TESTCASE_STRING = """\
-  <testcase name="%(test_name)s" status="%(status)s" result="%(result)s"\
- time="%(run_time).3f" classname="%(classname)s" timestamp="%(start_time)s">\
-%(message)s"""
-
-FAILURE_MESSAGE = r"""
-  <failure message="e" type="{}"><!\[CDATA\[Traceback \(most recent call last\):
-  File ".*xml_reporter_test\.py", line \d+, in get_sample_failure
-    self.fail\(\'e\'\)
-AssertionError: e
-\]\]></failure>""".format(xml_escaped_exception_type(AssertionError))
-
-ERROR_MESSAGE = r"""
-  <error message="invalid&#x20;literal&#x20;for&#x20;int\(\)&#x20;with&#x20;base&#x20;10:&#x20;(&apos;)?a(&apos;)?" type="{}"><!\[CDATA\[Traceback \(most recent call last\):
-  File ".*xml_reporter_test\.py", line \d+, in get_sample_error
-    int\('a'\)
-ValueError: invalid literal for int\(\) with base 10: '?a'?
-\]\]></error>""".format(xml_escaped_exception_type(ValueError))
-
-UNICODE_MESSAGE = r"""
-  <%s message="{0}" type="{1}"><!\[CDATA\[Traceback \(most recent call last\):
-  File ".*xml_reporter_test\.py", line \d+, in get_unicode_sample_failure
-    raise AssertionError\(u'\\xe9'\)
-AssertionError: {0}
-\]\]></%s>""".format(
-        r'\xe9',
-        xml_escaped_exception_type(AssertionError))
-
-NEWLINE_MESSAGE = r"""
-  <%s message="{0}" type="{1}"><!\[CDATA\[Traceback \(most recent call last\):
-  File ".*xml_reporter_test\.py", line \d+, in get_newline_message_sample_failure
-    raise AssertionError\(\'{2}'\)
-AssertionError: {3}
-\]\]></%s>""".format(
-    'new&#xA;line',
-    xml_escaped_exception_type(AssertionError),
-    r'new\\nline',
-    'new\nline')
-
-UNEXPECTED_SUCCESS_MESSAGE = '\n'.join([
-    '',
-    (r'  <error message="" type=""><!\[CDATA\[Test case '
-     r'__main__.MockTest.unexpectedly_passing_test should have failed, '
-     r'but passed.\]\]></error>'),
-])
-
-UNICODE_ERROR_MESSAGE = UNICODE_MESSAGE % ('error', 'error')
-NEWLINE_ERROR_MESSAGE = NEWLINE_MESSAGE % ('error', 'error')
-
-
-class TextAndXMLTestResultTest(absltest.TestCase):
+class _FakeTest(object):
+  """Stand-in for MockTest that skips the TestCase constructor.
+
+  It provides the id(), shortDescription() and failureException the reporter
+  reads from a test, which is enough for the concurrency stress tests. The
+  reporter names the <testsuite> after type(test).__name__ though, so reports
+  built from these tests have a "_FakeTest" suite whatever class the ids name.
+  """
+  __slots__ = ('_id',)
+  failureException = AssertionError
+
+  def __init__(self, test_id):
+    self._id = test_id
+
+  def id(self):
+    return self._id
+
+  def shortDescription(self):
+    return None
+
+
+# MockTest never runs and the reporter only reads from it, so tests share one
+# instance per test id. Distinct ids still get distinct instances, since the
+# reporter keys its results by id(test).
+@functools.lru_cache(maxsize=None)
+def _get_mock_test(name):
+  return MockTest(name)
+
+
+# Matches the traceback of a sample exception raised by one of the
+# TextAndXMLTestResultTest._make_* helpers.
+_TRACEBACK_TEMPLATE = r"""Traceback \(most recent call last\):
+  File "[^"]*xml_reporter_test\.py", line \d+, in {function}
+    {source}
+{exception}
+"""
+
+
+def _traceback_re(function, source, exception):
+  return _TRACEBACK_TEMPLATE.format_map(
+      {'function': function, 'source': source, 'exception': exception})
+
+
+_UNICODE_TRACEBACK = _traceback_re(
+    '_make_unicode_sample_failure', r"raise AssertionError\(u'\\xe9'\)",
+    r'AssertionError: \xe9')
+_NEWLINE_TRACEBACK = _traceback_re(
+    '_make_newline_message_sample_failure',
+    r"raise AssertionError\('new\\nline'\)", 'AssertionError: new\nline')
+
+# Expected <failure>/<error> children of a <testcase>, as
+# (tag, message, type, traceback_regex) tuples. The traceback regex is matched
+# against the CDATA text of the element.
+FAILURE_MESSAGE = (
+    'failure', 'e', str(AssertionError),
+    _traceback_re('_make_sample_failure',
+                  r"MockTest\('sample'\)\.fail\('e'\)", 'AssertionError: e'))
+
+ERROR_MESSAGE = (
+    'error', "invalid literal for int() with base 10: 'a'", str(ValueError),
+    _traceback_re('_make_sample_error', r"int\('a'\)",
+                  r"ValueError: invalid literal for int\(\) with base 10: 'a'"))
+
+UNICODE_ERROR_MESSAGE = ('error', '\xe9', str(AssertionError),
+                         _UNICODE_TRACEBACK)
+UNICODE_FAILURE_MESSAGE = ('failure', '\xe9', str(AssertionError),
+                           _UNICODE_TRACEBACK)
+
+NEWLINE_ERROR_MESSAGE = ('error', 'new\nline', str(AssertionError),
+                         _NEWLINE_TRACEBACK)
+NEWLINE_FAILURE_MESSAGE = ('failure', 'new\nline', str(AssertionError),
+                           _NEWLINE_TRACEBACK)
+
+TERMINAL_ESCAPE_ERROR_MESSAGE = (
+    'error', r'\x1b', str(AssertionError),
+    _traceback_re('_make_terminal_escape_sample_failure',
+                  r"raise AssertionError\('\\x1b'\)", r'AssertionError: \\x1b'))
+
+UNEXPECTED_SUCCESS_MESSAGE = (
+    'error', '', '',
+    r'Test case __main__\.MockTest\.unexpectedly_passing_test should have '
+    r'failed, but passed\.')
+
+
+@functools.lru_cache(maxsize=None)
+def _iso_timestamp(timestamp):
+  return datetime.datetime.utcfromtimestamp(timestamp).isoformat() + '+00:00'
+
+
+# Tests usually validate a report and then inspect it, so the parsed tree is
+# cached by content. Callers must not modify the returned element.
+@functools.lru_cache(maxsize=64)
+def _parse_xml(xml_output):
+  return ElementTree.fromstring(xml_output)
+
+
+def _expected_testcase(test_name, start_time, end_time, messages=(),
+                       skipped=False):
+  """Returns the testcases entry _assert_xml_testsuite expects for a test."""
+  testcase = {
+      'name': test_name,
+      'run_time': end_time - start_time,
+      'start_time': start_time,
+      'messages': messages,
+  }
+  if skipped:
+    testcase.update(status='notrun', result='suppressed')
+  return testcase
+
+
+class TextAndXMLTestResultTest(parameterized.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    # The reporter only formats these, so one sample of each kind is shared by
+    # every test instead of raising and catching again each time.
+    cls._sample_error = cls._make_sample_error()
+    cls._sample_failure = cls._make_sample_failure()
+    cls._newline_message_sample_failure = (
+        cls._make_newline_message_sample_failure())
+    cls._unicode_sample_failure = cls._make_unicode_sample_failure()
+    cls._terminal_escape_sample_failure = (
+        cls._make_terminal_escape_sample_failure())
 
   def setUp(self):
     super().setUp()
-    self.stream = StringIOWriteLn()
-    self.xml_stream = io.StringIO()
+    self.stream = _ListStream()
+    self.xml_stream = _ListStream()
 
   def _make_result(self, times):
-    timer = mock.Mock()
-    timer.side_effect = times
+    # Hands out the given times in order, one per call.
+    timer = iter(times).__next__
     return xml_reporter._TextAndXMLTestResult(self.xml_stream, self.stream,
                                               'foo', 0, timer)
 
-  def _assert_match(self, regex, output, flags=0):
-    fail_msg = 'Expected regex:\n{}\nTo match:\n{}'.format(regex, output)
-    result = re.match(regex, output, flags)
-    if result is None:
-      self.fail(fail_msg)
-    return result.groups()
+  def _assert_match(self, regex, output):
+    """Asserts that regex matches all of output."""
+    if re.fullmatch(regex, output) is None:
+      self.fail('Expected regex:\n{}\nTo match:\n{}'.format(regex, output))
 
   def _assert_valid_xml(self, xml_output):
     try:
-      expat.ParserCreate().Parse(xml_output)
-    except expat.ExpatError as e:
+      _parse_xml(xml_output)
+    except ElementTree.ParseError as e:
       raise AssertionError('Bad XML output: {}\n{}'.format(e, xml_output))
 
+  def _assert_xml_testsuite(self, xml_output, *, suite_name, tests, failures,
+                            errors, run_time, start_time, testcases):
+    """Checks the structure of an XML report holding a single <testsuite>.
+
+    Args:
+      xml_output: the XML report written by the reporter.
+      suite_name: the expected name of the <testsuite>.
+      tests: the expected number of tests.
+      failures: the expected number of failures.
+      errors: the expected number of errors.
+      run_time: the expected duration of the run, in seconds.
+      start_time: the expected start of the run, in seconds since the epoch.
+      testcases: a list of dicts describing the expected <testcase> elements in
+          document order. Each dict has the 'name', 'run_time' and 'start_time'
+          of the test case, and optionally its 'classname', 'status', 'result'
+          and a list of 'messages' in the format of FAILURE_MESSAGE.
+    """
+    self.assertStartsWith(xml_output, '<?xml version="1.0"?>\n')
+    root = _parse_xml(xml_output)
+    summary = {
+        'tests': str(tests),
+        'failures': str(failures),
+        'errors': str(errors),
+        'time': f'{run_time:.3f}',
+        'timestamp': _iso_timestamp(start_time),
+    }
+    self.assertEqual(root.tag, 'testsuites')
+    self.assertEqual(root.attrib, dict(summary, name=''))
+    self.assertLen(root, 1)
+    suite = root[0]
+    self.assertEqual(suite.tag, 'testsuite')
+    self.assertEqual(suite.attrib, dict(summary, name=suite_name))
+    self.assertLen(suite, len(testcases))
+    for testcase, expected in zip(suite, testcases):
+      self.assertEqual(testcase.tag, 'testcase')
+      self.assertEqual(testcase.attrib, {
+          'name': expected['name'],
+          'status': expected.get('status', 'run'),
+          'result': expected.get('result', 'completed'),
+          'time': f'{expected["run_time"]:.3f}',
+          'classname': expected.get('classname', '__main__.MockTest'),
+          'timestamp': _iso_timestamp(expected['start_time']),
+      })
+      messages = expected.get('messages', ())
+      self.assertLen(testcase, len(messages))
+      for element, (tag, message, exc_type, traceback_re) in zip(
+          testcase, messages):
+        self.assertEqual(element.tag, tag)
+        self.assertEqual(element.attrib, {'message': message, 'type': exc_type})
+        self._assert_match(traceback_re, element.text)
+
   def _simulate_error_test(self, test, result):
     result.startTest(test)
     result.addError(test, self.get_sample_error())
@@ -168,52 +284,243 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.addSuccess(test)
     result.stopTest(test)
 
-  def _iso_timestamp(self, timestamp):
-    return datetime.datetime.utcfromtimestamp(timestamp).isoformat() + '+00:00'
+  def _simulate_newline_error_test(self, test, result):
+    result.startTest(test)
+    result.addError(test, self.get_newline_message_sample_failure())
+    result.stopTest(test)
 
-  def test_with_passing_test(self):
-    start_time = 0
-    end_time = 2
-    result = self._make_result((start_time, start_time, end_time, end_time))
+  def _simulate_unicode_error_test(self, test, result):
+    result.startTest(test)
+    result.addError(test, self.get_unicode_sample_failure())
+    result.stopTest(test)
 
-    test = MockTest('__main__.MockTest.passing_test')
-    result.startTestRun()
+  def _simulate_newline_failing_test(self, test, result):
     result.startTest(test)
-    result.addSuccess(test)
+    result.addFailure(test, self.get_newline_message_sample_failure())
+    result.stopTest(test)
+
+  def _simulate_unicode_failing_test(self, test, result):
+    result.startTest(test)
+    result.addFailure(test, self.get_unicode_sample_failure())
+    result.stopTest(test)
+
+  def _simulate_terminal_escape_error_test(self, test, result):
+    result.startTest(test)
+    result.addError(test, self.get_terminal_escape_sample_failure())
+    result.stopTest(test)
+
+  def _simulate_fail_and_error_test(self, test, result):
+    result.startTest(test)
+    result.addFailure(test, self.get_sample_failure())
+    # This could happen in tearDown
+    result.addError(test, self.get_sample_error())
+    result.stopTest(test)
+
+  def _simulate_error_and_fail_test(self, test, result):
+    result.startTest(test)
+    result.addError(test, self.get_sample_error())
+    result.addFailure(test, self.get_sample_failure())
     result.stopTest(test)
+
+  def _simulate_expected_failure_test(self, test, result):
+    try:
+      raise RuntimeError('Test expectedFailure')
+    except RuntimeError:
+      error_values = sys.exc_info()
+
+    result.startTest(test)
+    result.addExpectedFailure(test, error_values)
+    result.stopTest(test)
+
+  def _simulate_unexpected_success_test(self, test, result):
+    result.startTest(test)
+    result.addUnexpectedSuccess(test)
+    result.stopTest(test)
+
+  def _simulate_skipped_test(self, test, result):
+    result.startTest(test)
+    result.addSkip(test, 'b"r')
+    result.stopTest(test)
+
+  # Runs of a single test, each checked by test_with and, all together, by
+  # test_all_scenarios_one_shot.
+  _SCENARIOS = (
+      dict(
+          testcase_name='passing_test',
+          simulate=_simulate_passing_test,
+          test_name='passing_test',
+          start_time=0,
+          end_time=2),
+      dict(
+          testcase_name='failing_test',
+          simulate=_simulate_failing_test,
+          test_name='failing_test',
+          start_time=10,
+          end_time=20,
+          failures=1,
+          messages=[FAILURE_MESSAGE]),
+      dict(
+          testcase_name='error_test',
+          simulate=_simulate_error_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          errors=1,
+          messages=[ERROR_MESSAGE]),
+      dict(
+          testcase_name='fail_and_error_test',
+          simulate=_simulate_fail_and_error_test,
+          test_name='failing_test',
+          start_time=123,
+          end_time=456,
+          # Only the failure is tallied (because it was first).
+          failures=1,
+          # Messages from failure and error should be concatenated in order.
+          messages=[FAILURE_MESSAGE, ERROR_MESSAGE]),
+      dict(
+          testcase_name='error_and_fail_test',
+          simulate=_simulate_error_and_fail_test,
+          test_name='failing_test',
+          start_time=123,
+          end_time=456,
+          # Only the error is tallied (because it was first).
+          errors=1,
+          # Messages from error and failure should be concatenated in order.
+          messages=[ERROR_MESSAGE, FAILURE_MESSAGE]),
+      dict(
+          testcase_name='newline_error_test',
+          simulate=_simulate_newline_error_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          errors=1,
+          messages=[NEWLINE_ERROR_MESSAGE]),
+      dict(
+          testcase_name='unicode_error_test',
+          simulate=_simulate_unicode_error_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          errors=1,
+          messages=[UNICODE_ERROR_MESSAGE]),
+      dict(
+          testcase_name='newline_failing_test',
+          simulate=_simulate_newline_failing_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          failures=1,
+          messages=[NEWLINE_FAILURE_MESSAGE]),
+      dict(
+          testcase_name='unicode_failing_test',
+          simulate=_simulate_unicode_failing_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          failures=1,
+          messages=[UNICODE_FAILURE_MESSAGE]),
+      dict(
+          testcase_name='terminal_escape_error',
+          simulate=_simulate_terminal_escape_error_test,
+          test_name='failing_test',
+          start_time=100,
+          end_time=200,
+          errors=1,
+          messages=[TERMINAL_ESCAPE_ERROR_MESSAGE]),
+      dict(
+          testcase_name='expected_failure_test',
+          simulate=_simulate_expected_failure_test,
+          test_name='expected_failing_test',
+          start_time=100,
+          end_time=200),
+      dict(
+          testcase_name='unexpected_success_error_test',
+          simulate=_simulate_unexpected_success_test,
+          test_name='unexpectedly_passing_test',
+          start_time=100,
+          end_time=200,
+          errors=1,
+          messages=[UNEXPECTED_SUCCESS_MESSAGE]),
+      dict(
+          testcase_name='skipped_test',
+          simulate=_simulate_skipped_test,
+          test_name='skipped_test_with_reason',
+          start_time=100,
+          end_time=100,
+          skipped=True),
+      dict(
+          testcase_name='no_suite_name',
+          simulate=_simulate_passing_test,
+          test_name='bad_name',
+          start_time=1000,
+          end_time=1200),
+  )
+
+  @parameterized.named_parameters(*_SCENARIOS)
+  def test_with(self, simulate, test_name, start_time, end_time, failures=0,
+                errors=0, messages=(), skipped=False):
+    result = self._make_result((start_time, start_time, end_time, end_time))
+
+    test = _get_mock_test(f'__main__.MockTest.{test_name}')
+    result.startTestRun()
+    simulate(self, test, result)
     result.stopTestRun()
     result.printErrors()
+    xml = self.xml_stream.getvalue()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'passing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_valid_xml(xml)
+
+    self._assert_xml_testsuite(
+        xml,
+        suite_name='MockTest',
+        tests=1,
+        failures=failures,
+        errors=errors,
+        run_time=end_time - start_time,
+        start_time=start_time,
+        testcases=[_expected_testcase(
+            test_name, start_time, end_time, messages, skipped)])
+
+  def test_all_scenarios_one_shot(self):
+    """Runs every _SCENARIOS entry through one result and one report."""
+    start_time = min(scenario['start_time'] for scenario in self._SCENARIOS)
+    end_time = max(scenario['end_time'] for scenario in self._SCENARIOS)
+    times = [start_time]
+    for scenario in self._SCENARIOS:
+      times += [scenario['start_time'], scenario['end_time']]
+    times.append(end_time)
+    result = self._make_result(times)
+
+    result.startTestRun()
+    for scenario in self._SCENARIOS:
+      test = _get_mock_test(f'__main__.MockTest.{scenario["test_name"]}')
+      scenario['simulate'](self, test, result)
+    result.stopTestRun()
+    result.printErrors()
+
+    # The reporter sorts test cases by name; the sort is stable, so cases with
+    # the same name keep the order they ran in.
+    testcases = sorted(
+        (_expected_testcase(s['test_name'], s['start_time'], s['end_time'],
+                            s.get('messages', ()), s.get('skipped', False))
+         for s in self._SCENARIOS),
+        key=lambda testcase: testcase['name'])
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=len(self._SCENARIOS),
+        failures=sum(s.get('failures', 0) for s in self._SCENARIOS),
+        errors=sum(s.get('errors', 0) for s in self._SCENARIOS),
+        run_time=end_time - start_time,
+        start_time=start_time,
+        testcases=testcases)
 
   def test_with_passing_subtest(self):
     start_time = 0
     end_time = 2
     result = self._make_result((start_time, start_time, end_time, end_time))
 
-    test = MockTest('__main__.MockTest.passing_test')
+    test = _get_mock_test('__main__.MockTest.passing_test')
     subtest = unittest.case._SubTest(test, 'msg', None)  # pytype: disable=module-attr
     result.startTestRun()
     result.startTest(test)
@@ -221,36 +528,27 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.stopTestRun()
     result.printErrors()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
     run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': r'passing_test&#x20;\[msg\]',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=1,
+        failures=0,
+        errors=0,
+        run_time=run_time,
+        start_time=start_time,
+        testcases=[{
+            'name': 'passing_test [msg]',
+            'run_time': run_time,
+            'start_time': start_time,
+        }])
 
   def test_with_passing_subtest_with_dots_in_parameter_name(self):
     start_time = 0
     end_time = 2
     result = self._make_result((start_time, start_time, end_time, end_time))
 
-    test = MockTest('__main__.MockTest.passing_test')
+    test = _get_mock_test('__main__.MockTest.passing_test')
     subtest = unittest.case._SubTest(test, 'msg', {'case': 'a.b.c'})  # pytype: disable=module-attr
     result.startTestRun()
     result.startTest(test)
@@ -258,114 +556,82 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.stopTestRun()
     result.printErrors()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
     run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name':
-            r'passing_test&#x20;\[msg\]&#x20;\(case=&apos;a.b.c&apos;\)',
-        'classname':
-            '__main__.MockTest',
-        'status':
-            'run',
-        'result':
-            'completed',
-        'attributes':
-            '',
-        'message':
-            ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=1,
+        failures=0,
+        errors=0,
+        run_time=run_time,
+        start_time=start_time,
+        testcases=[{
+            'name': "passing_test [msg] (case='a.b.c')",
+            'run_time': run_time,
+            'start_time': start_time,
+        }])
 
   def get_sample_error(self):
+    return self._sample_error
+
+  def get_sample_failure(self):
+    return self._sample_failure
+
+  def get_newline_message_sample_failure(self):
+    return self._newline_message_sample_failure
+
+  def get_unicode_sample_failure(self):
+    return self._unicode_sample_failure
+
+  def get_terminal_escape_sample_failure(self):
+    return self._terminal_escape_sample_failure
+
+  @staticmethod
+  def _make_sample_error():
     try:
       int('a')
     except ValueError:
       error_values = sys.exc_info()
       return error_values
 
-  def get_sample_failure(self):
+  @staticmethod
+  def _make_sample_failure():
     try:
-      self.fail('e')
+      MockTest('sample').fail('e')
     except AssertionError:
       error_values = sys.exc_info()
       return error_values
 
-  def get_newline_message_sample_failure(self):
+  @staticmethod
+  def _make_newline_message_sample_failure():
     try:
       raise AssertionError('new\nline')
     except AssertionError:
       error_values = sys.exc_info()
       return error_values
 
-  def get_unicode_sample_failure(self):
+  @staticmethod
+  def _make_unicode_sample_failure():
     try:
       raise AssertionError(u'\xe9')
     except AssertionError:
       error_values = sys.exc_info()
       return error_values
 
-  def get_terminal_escape_sample_failure(self):
+  @staticmethod
+  def _make_terminal_escape_sample_failure():
     try:
       raise AssertionError('\x1b')
     except AssertionError:
       error_values = sys.exc_info()
       return error_values
 
-  def test_with_failing_test(self):
-    start_time = 10
-    end_time = 20
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addFailure(test, self.get_sample_failure())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 1,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': FAILURE_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
   def test_with_failing_subtest(self):
     start_time = 10
     end_time = 20
     result = self._make_result((start_time, start_time, end_time, end_time))
 
-    test = MockTest('__main__.MockTest.failing_test')
+    test = _get_mock_test('__main__.MockTest.failing_test')
     subtest = unittest.case._SubTest(test, 'msg', None)  # pytype: disable=module-attr
     result.startTestRun()
     result.startTest(test)
@@ -373,75 +639,28 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.stopTestRun()
     result.printErrors()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
     run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 1,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': r'failing_test&#x20;\[msg\]',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': FAILURE_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_error_test(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addError(test, self.get_sample_error())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-    xml = self.xml_stream.getvalue()
-
-    self._assert_valid_xml(xml)
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ERROR_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, xml, re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=1,
+        failures=1,
+        errors=0,
+        run_time=run_time,
+        start_time=start_time,
+        testcases=[{
+            'name': 'failing_test [msg]',
+            'run_time': run_time,
+            'start_time': start_time,
+            'messages': [FAILURE_MESSAGE],
+        }])
 
   def test_with_error_subtest(self):
     start_time = 10
     end_time = 20
     result = self._make_result((start_time, start_time, end_time, end_time))
 
-    test = MockTest('__main__.MockTest.error_test')
+    test = _get_mock_test('__main__.MockTest.error_test')
     subtest = unittest.case._SubTest(test, 'msg', None)  # pytype: disable=module-attr
     result.startTestRun()
     result.startTest(test)
@@ -449,323 +668,21 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.stopTestRun()
     result.printErrors()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': r'error_test&#x20;\[msg\]',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ERROR_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_fail_and_error_test(self):
-    """Tests a failure and subsequent error within a single result."""
-    start_time = 123
-    end_time = 456
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addFailure(test, self.get_sample_failure())
-    # This could happen in tearDown
-    result.addError(test, self.get_sample_error())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-    xml = self.xml_stream.getvalue()
-
-    self._assert_valid_xml(xml)
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
     run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 1,  # Only the failure is tallied (because it was first).
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        # Messages from failure and error should be concatenated in order.
-        'message': FAILURE_MESSAGE + ERROR_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, xml, re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_error_and_fail_test(self):
-    """Tests an error and subsequent failure within a single result."""
-    start_time = 123
-    end_time = 456
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addError(test, self.get_sample_error())
-    result.addFailure(test, self.get_sample_failure())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-    xml = self.xml_stream.getvalue()
-
-    self._assert_valid_xml(xml)
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,  # Only the error is tallied (because it was first).
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        # Messages from error and failure should be concatenated in order.
-        'message': ERROR_MESSAGE + FAILURE_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, xml, re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_newline_error_test(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addError(test, self.get_newline_message_sample_failure())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-    xml = self.xml_stream.getvalue()
-
-    self._assert_valid_xml(xml)
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    } + '\n'
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': NEWLINE_ERROR_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, xml, re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_unicode_error_test(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addError(test, self.get_unicode_sample_failure())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-    xml = self.xml_stream.getvalue()
-
-    self._assert_valid_xml(xml)
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': UNICODE_ERROR_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, xml, re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_terminal_escape_error(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addError(test, self.get_terminal_escape_sample_failure())
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    self._assert_valid_xml(self.xml_stream.getvalue())
-
-  def test_with_expected_failure_test(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-    error_values = ''
-
-    try:
-      raise RuntimeError('Test expectedFailure')
-    except RuntimeError:
-      error_values = sys.exc_info()
-
-    test = MockTest('__main__.MockTest.expected_failing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addExpectedFailure(test, error_values)
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'expected_failing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase, re.DOTALL)
-
-  def test_with_unexpected_success_error_test(self):
-    start_time = 100
-    end_time = 200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.unexpectedly_passing_test')
-    result.startTestRun()
-    result.startTest(test)
-    result.addUnexpectedSuccess(test)
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 1,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'unexpectedly_passing_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': UNEXPECTED_SUCCESS_MESSAGE
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
-
-  def test_with_skipped_test(self):
-    start_time = 100
-    end_time = 100
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.skipped_test_with_reason')
-    result.startTestRun()
-    result.startTest(test)
-    result.addSkip(test, 'b"r')
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'skipped_test_with_reason',
-        'classname': '__main__.MockTest',
-        'status': 'notrun',
-        'result': 'suppressed',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=1,
+        failures=0,
+        errors=1,
+        run_time=run_time,
+        start_time=start_time,
+        testcases=[{
+            'name': 'error_test [msg]',
+            'run_time': run_time,
+            'start_time': start_time,
+            'messages': [ERROR_MESSAGE],
+        }])
 
   def test_two_tests_with_time(self):
     start_time1 = 100
@@ -776,13 +693,13 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result = self._make_result((start_time1, start_time1, end_time1,
                                 start_time2, end_time2, end_time2))
 
-    test = MockTest(f'{name}one_test')
+    test = _get_mock_test(f'{name}one_test')
     result.startTestRun()
     result.startTest(test)
     result.addSuccess(test)
     result.stopTest(test)
 
-    test = MockTest(f'{name}another_test')
+    test = _get_mock_test(f'{name}another_test')
     result.startTest(test)
     result.addSuccess(test)
     result.stopTest(test)
@@ -791,79 +708,24 @@ class TextAndXMLTestResultTest(absltest.TestCase):
 
     start_time = min(start_time1, start_time2)
     run_time = max(end_time1, end_time2) - start_time
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    start_time_str1 = re.escape(self._iso_timestamp(start_time1))
-    start_time_str2 = re.escape(self._iso_timestamp(start_time2))
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 2,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase1_re = TESTCASE_STRING % {
-        'run_time': end_time1 - start_time1,
-        'start_time': start_time_str1,
-        'test_name': 'one_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'message': ''
-    }
-    expected_testcase2_re = TESTCASE_STRING % {
-        'run_time': end_time2 - start_time2,
-        'start_time': start_time_str2,
-        'test_name': 'another_test',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'message': ''
-    }
-
-    (testcases,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                      re.DOTALL)
-    [testcase1, testcase2] = testcases.split('\n  </testcase>\n')
-    # Sorting by test name flips the order of the two tests.
-    self._assert_match(expected_testcase2_re, testcase1)
-    self._assert_match(expected_testcase1_re, testcase2)
-
-  def test_with_no_suite_name(self):
-    start_time = 1000
-    end_time = 1200
-    result = self._make_result((start_time, start_time, end_time, end_time))
-
-    test = MockTest('__main__.MockTest.bad_name')
-    result.startTestRun()
-    result.startTest(test)
-    result.addSuccess(test)
-    result.stopTest(test)
-    result.stopTestRun()
-    result.printErrors()
-
-    start_time_str = re.escape(self._iso_timestamp(start_time))
-    run_time = end_time - start_time
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'MockTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': 'bad_name',
-        'classname': '__main__.MockTest',
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='MockTest',
+        tests=2,
+        failures=0,
+        errors=0,
+        run_time=run_time,
+        start_time=start_time,
+        # Sorting by test name flips the order of the two tests.
+        testcases=[{
+            'name': 'another_test',
+            'run_time': end_time2 - start_time2,
+            'start_time': start_time2,
+        }, {
+            'name': 'one_test',
+            'run_time': end_time1 - start_time1,
+            'start_time': start_time1,
+        }])
 
   def test_unnamed_parameterized_testcase(self):
     """Test unnamed parameterized test cases.
@@ -890,37 +752,27 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     result.stopTestRun()
     result.printErrors()
 
-    start_time_str = re.escape(self._iso_timestamp(start_time))
     run_time = end_time - start_time
-    classname = xml_reporter._escape_xml_attr(
-        unittest.util.strclass(test.__class__))
-    expected_re = OUTPUT_STRING % {
-        'suite_name': 'ParameterizedTest',
-        'tests': 1,
-        'failures': 0,
-        'errors': 0,
-        'run_time': run_time,
-        'start_time': start_time_str,
-    }
-    expected_testcase_re = TESTCASE_STRING % {
-        'run_time': run_time,
-        'start_time': start_time_str,
-        'test_name': re.escape('test_prefix0&#x20;(&apos;a&#x20;(b.c)&apos;)'),
-        'classname': classname,
-        'status': 'run',
-        'result': 'completed',
-        'attributes': '',
-        'message': ''
-    }
-    (testcase,) = self._assert_match(expected_re, self.xml_stream.getvalue(),
-                                     re.DOTALL)
-    self._assert_match(expected_testcase_re, testcase)
+    self._assert_xml_testsuite(
+        self.xml_stream.getvalue(),
+        suite_name='ParameterizedTest',
+        tests=1,
+        failures=0,
+        errors=0,
+        run_time=run_time,
+        start_time=start_time,
+        testcases=[{
+            'name': "test_prefix0 ('a (b.c)')",
+            'classname': unittest.util.strclass(test.__class__),
+            'run_time': run_time,
+            'start_time': start_time,
+        }])
 
   def teststop_test_without_pending_test(self):
     end_time = 1200
     result = self._make_result((end_time,))
 
-    test = MockTest('__main__.MockTest.bad_name')
+    test = _get_mock_test('__main__.MockTest.bad_name')
     result.stopTest(test)
     result.stopTestRun()
     # Just verify that this doesn't crash
@@ -934,29 +786,34 @@ class TextAndXMLTestResultTest(absltest.TestCase):
 
   def test_timing_with_time_stub(self):
     """Make sure that timing is correct even if time.time is stubbed out."""
-    saved_time = time.time
-    try:
-      time.time = lambda: -1
+    with mock.patch.object(time, 'time', return_value=-1):
       reporter = xml_reporter._TextAndXMLTestResult(self.xml_stream,
                                                     self.stream,
                                                     'foo', 0)
-      test = MockTest('bar')
+      test = _get_mock_test('bar')
       reporter.startTest(test)
       self.assertNotEqual(reporter.start_time, -1)
-    finally:
-      time.time = saved_time
+
+  def test_timing_with_injected_time_getter(self):
+    """Make sure that timing comes from the injected time_getter."""
+    reporter = xml_reporter._TextAndXMLTestResult(self.xml_stream, self.stream,
+                                                  'foo', 0,
+                                                  time_getter=lambda: 42)
+    reporter.startTest(_get_mock_test('bar'))
+    self.assertEqual(reporter.start_time, 42)
 
   def test_concurrent_add_and_delete_pending_test_case_result(self):
     """Make sure adding/deleting pending test case results are thread safe."""
     result = xml_reporter._TextAndXMLTestResult(None, self.stream, None, 0,
                                                 None)
-    def add_and_delete_pending_test_case_result(test_name):
-      test = MockTest(test_name)
+    def add_and_delete_pending_test_case_result(test):
       result.addSuccess(test)
       result.delete_pending_test_case_result(test)
 
-    for i in range(50):
-      add_and_delete_pending_test_case_result('add_and_delete_test%s' % i)
+    tests = [_get_mock_test(f'add_and_delete_test{i}') for i in range(50)]
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+      # Consuming the results re-raises any exception from the workers.
+      list(executor.map(add_and_delete_pending_test_case_result, tests))
     self.assertEqual(result.pending_test_case_results, {})
 
   def test_concurrent_test_runs(self):
@@ -966,66 +823,58 @@ class TextAndXMLTestResultTest(absltest.TestCase):
     num_error_tests = 20
     total_num_tests = num_passing_tests + num_failing_tests + num_error_tests
 
-    times = [0] + [i for i in range(2 * total_num_tests)
-                  ] + [2 * total_num_tests - 1]
+    times = [0, *range(2 * total_num_tests), 2 * total_num_tests - 1]
     result = self._make_result(times)
-    threads = []
+    jobs = []
     names = []
     result.startTestRun()
-    for i in range(num_passing_tests):
-      name = 'passing_concurrent_test_%s' % i
-      names.append(name)
-      test_name = '__main__.MockTest.%s' % name
-      # xml_reporter uses id(test) as the test identifier.
-      # In a real testing scenario, all the test instances are created before
-      # running them. So all ids will be unique.
-      # We must do the same here: create test instance beforehand.
-      test = MockTest(test_name)
-      threads.append(threading.Thread(
-          target=self._simulate_passing_test, args=(test, result)))
-    for i in range(num_failing_tests):
-      name = 'failing_concurrent_test_%s' % i
-      names.append(name)
-      test_name = '__main__.MockTest.%s' % name
-      test = MockTest(test_name)
-      threads.append(threading.Thread(
-          target=self._simulate_failing_test, args=(test, result)))
-    for i in range(num_error_tests):
-      name = 'error_concurrent_test_%s' % i
-      names.append(name)
-      test_name = '__main__.MockTest.%s' % name
-      test = MockTest(test_name)
-      threads.append(threading.Thread(
-          target=self._simulate_error_test, args=(test, result)))
-    for t in threads:
-      t.start()
-    for t in threads:
-      t.join()
+    for prefix, num_tests, simulate in (
+        ('passing_concurrent_test', num_passing_tests,
+         self._simulate_passing_test),
+        ('failing_concurrent_test', num_failing_tests,
+         self._simulate_failing_test),
+        ('error_concurrent_test', num_error_tests,
+         self._simulate_error_test)):
+      for i in range(num_tests):
+        name = f'{prefix}_{i}'
+        names.append(name)
+        # xml_reporter uses id(test) as the test identifier.
+        # In a real testing scenario, all the test instances are created before
+        # running them. So all ids will be unique.
+        # We must do the same here: create test instance beforehand.
+        test = _FakeTest(f'__main__.MockTest.{name}')
+        jobs.append((simulate, test))
+    with futures.ThreadPoolExecutor(max_workers=16) as executor:
+      pending = [executor.submit(simulate, test, result)
+                 for simulate, test in jobs]
+    # Re-raises the first exception from any of the simulated tests.
+    for future in pending:
+      future.result()
 
     result.stopTestRun()
     result.printErrors()
-    tests_not_in_xml = []
-    for tn in names:
-      if tn not in self.xml_stream.getvalue():
-        tests_not_in_xml.append(tn)
-    msg = ('Expected xml_stream to contain all test %s results, but %s tests '
-           'are missing. List of missing tests: %s' % (
-               total_num_tests, len(tests_not_in_xml), tests_not_in_xml))
-    self.assertEqual([], tests_not_in_xml, msg)
+    root = _parse_xml(self.xml_stream.getvalue())
+    names_in_xml = {testcase.get('name') for testcase in root.iter('testcase')}
+    tests_not_in_xml = [tn for tn in names if tn not in names_in_xml]
+    if tests_not_in_xml:
+      self.fail(f'Expected xml_stream to contain all test {total_num_tests} '
+                f'results, but {len(tests_not_in_xml)} tests are missing. '
+                f'List of missing tests: {tests_not_in_xml}')
 
   def test_add_failure_during_stop_test(self):
     """Tests an addFailure() call from within a stopTest() call stack."""
     result = self._make_result((0, 2))
-    test = MockTest('__main__.MockTest.failing_test')
+    test = _get_mock_test('__main__.MockTest.failing_test')
     result.startTestRun()
     result.startTest(test)
 
     # Replace parent stopTest method from unittest.TextTestResult with
     # a version that calls self.addFailure().
+    sample_failure = self.get_sample_failure()
     with mock.patch.object(
         unittest.TextTestResult,
         'stopTest',
-        side_effect=lambda t: result.addFailure(t, self.get_sample_failure())):
+        side_effect=lambda t: result.addFailure(t, sample_failure)):
       # Run stopTest in a separate thread since we are looking to verify that
       # it does not deadlock, and would otherwise prevent the test from
       # completing.
@@ -1045,14 +894,133 @@ class XMLTest(absltest.TestCase):
                      '&quot;Hi&quot;&#x20;&lt;&apos;&gt;&#x9;&#xD;&#xA;')
 
 
+def _summarize_xml(xml_output):
+  """Collects the parts of a helper's XML report that the tests check.
+
+  The report is fed to an XMLPullParser and only its start/end events are
+  consumed; each <testcase> is cleared once it has been read.
+
+  Args:
+    xml_output: bytes of the XML report.
+
+  Returns:
+    A dict with the 'errors' and 'failures' counts of the report, the
+    attributes of its 'properties' and a list of its 'suites'. Each suite is a
+    dict with the suite 'name' and a list of 'cases'; each case is a dict with
+    the 'name' and 'classname' of the test case, plus the message of its
+    'error' and 'failure' when present.
+  """
+  parser = ElementTree.XMLPullParser(events=('start', 'end'))
+  parser.feed(xml_output)
+  parser.close()
+  summary = {'properties': [], 'suites': []}
+  for event, element in parser.read_events():
+    if event == 'start':
+      if element.tag == 'testsuites':
+        summary['errors'] = int(element.get('errors'))
+        summary['failures'] = int(element.get('failures'))
+      elif element.tag == 'testsuite':
+        summary['suites'].append({'name': element.get('name'), 'cases': []})
+    elif element.tag == 'testcase':
+      case = {'name': element.get('name'),
+              'classname': element.get('classname')}
+      for outcome in ('error', 'failure'):
+        child = element.find(outcome)
+        if child is not None:
+          case[outcome] = child.get('message')
+      summary['suites'][-1]['cases'].append(case)
+      element.clear()
+    elif element.tag == 'property':
+      summary['properties'].append(dict(element.attrib))
+  return summary
+
+
 class XmlReporterFixtureTest(absltest.TestCase):
 
-  def _get_helper(self):
-    binary_name = 'absl/testing/tests/xml_reporter_helper_test'
-    return _bazelize_command.get_executable_path(binary_name)
+  # Every flag the helper is run with. The runs are independent and dominated
+  # by process startup, so setUpClass starts them all at once and each test
+  # only waits for its own.
+  _HELPER_FLAGS = (
+      '--set_up_module_error',
+      '--tear_down_module_error',
+      '--set_up_class_error',
+      '--tear_down_class_error',
+      '--set_up_error',
+      '--tear_down_error',
+      '--test_error',
+      '--set_up_fail',
+      '--tear_down_fail',
+      '--test_fail',
+      '--test_randomize_ordering_seed=17',
+  )
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    cls._helper_runs = {}
+    try:
+      cls._start_helpers()
+    except BaseException:
+      # tearDownClass does not run when setUpClass fails, so reap the runs
+      # that did start here.
+      cls._reap_helpers()
+      raise
+
+  @classmethod
+  def tearDownClass(cls):
+    cls._reap_helpers()
+    super().tearDownClass()
+
+  @classmethod
+  def _start_helpers(cls):
+    cls._helper = _bazelize_command.get_executable_path(
+        'absl/testing/tests/xml_reporter_helper_test')
+    # The helper needs no inherited descriptors, and the pipes subprocess
+    # creates are non-inheritable, so leaving close_fds off skips closing every
+    # descriptor in the child and lets subprocess use posix_spawn.
+    # The console output is captured so the runs' output is not interleaved in
+    # the log.
+    popen_kwargs = {'close_fds': False, 'stdin': subprocess.DEVNULL,
+                    'stdout': subprocess.PIPE, 'stderr': subprocess.STDOUT}
+    for flag in cls._HELPER_FLAGS:
+      xml_fhandle, xml_fname = tempfile.mkstemp()
+      os.close(xml_fhandle)
+      args = [cls._helper, flag, '--xml_output_file=%s' % xml_fname]
+      try:
+        proc = subprocess.Popen(args, **popen_kwargs)
+      except BaseException:
+        os.remove(xml_fname)
+        raise
+      cls._helper_runs[flag] = (proc, xml_fname)
+
+  @classmethod
+  def _reap_helpers(cls):
+    for proc, xml_fname in cls._helper_runs.values():
+      proc.stdout.close()
+      proc.wait()
+      os.remove(xml_fname)
+
+  def _wait_for_helper(self, flag):
+    """Waits for the helper run started with flag in setUpClass.
 
-  def _run_test_and_get_xml(self, flag):
-    """Runs xml_reporter_helper_test and returns an Element instance.
+    The console output of the run is logged under its flag.
+
+    Args:
+      flag: flag xml_reporter_helper_test was run with; must be listed in
+          _HELPER_FLAGS.
+
+    Returns:
+      A (return code, XML output bytes) tuple.
+    """
+    proc, xml_fname = self._helper_runs[flag]
+    output, _ = proc.communicate()
+    logging.info('output of the helper run with %s is:\n%s', flag,
+                 output.decode('utf-8', 'replace'))
+    with open(xml_fname, 'rb') as f:
+      return proc.returncode, f.read()
+
+  def _run_test_and_summarize_xml(self, flag):
+    """Runs xml_reporter_helper_test and returns a summary of its XML output.
 
     Runs xml_reporter_helper_test in a new process so that it can
     exercise the entire test infrastructure, and easily test issues in
@@ -1062,65 +1030,38 @@ class XmlReporterFixtureTest(absltest.TestCase):
       flag: flag to pass to xml_reporter_helper_test
 
     Returns:
-      The Element instance of the XML output.
+      The summary of the XML output, as returned by _summarize_xml.
     """
-
-    xml_fhandle, xml_fname = tempfile.mkstemp()
-    os.close(xml_fhandle)
-
-    try:
-      binary = self._get_helper()
-      args = [binary, flag, '--xml_output_file=%s' % xml_fname]
-      ret = subprocess.call(args)
-      self.assertEqual(ret, 0)
-
-      xml = ElementTree.parse(xml_fname).getroot()
-    finally:
-      os.remove(xml_fname)
-
-    return xml
+    ret, xml_output = self._wait_for_helper(flag)
+    self.assertEqual(ret, 0)
+    return _summarize_xml(xml_output)
 
   def _run_test(self, flag, num_errors, num_failures, suites):
-    xml_fhandle, xml_fname = tempfile.mkstemp()
-    os.close(xml_fhandle)
-
-    try:
-      binary = self._get_helper()
-      args = [binary, flag, '--xml_output_file=%s' % xml_fname]
-      ret = subprocess.call(args)
-      self.assertNotEqual(ret, 0)
-
-      xml = ElementTree.parse(xml_fname).getroot()
-      logging.info('xml output is:\n%s', ElementTree.tostring(xml))
-    finally:
-      os.remove(xml_fname)
-
-    self.assertEqual(int(xml.attrib['errors']), num_errors)
-    self.assertEqual(int(xml.attrib['failures']), num_failures)
-    self.assertLen(xml, len(suites))
-    actual_suites = sorted(
-        xml.findall('testsuite'), key=lambda x: x.attrib['name'])
-    suites = sorted(suites, key=lambda x: x['name'])
+    ret, xml_output = self._wait_for_helper(flag)
+    self.assertNotEqual(ret, 0)
+    logging.info('xml output is:\n%s', xml_output)
+
+    summary = _summarize_xml(xml_output)
+    self.assertEqual(summary['errors'], num_errors)
+    self.assertEqual(summary['failures'], num_failures)
+    self.assertLen(summary['suites'], len(suites))
+    by_name = operator.itemgetter('name')
+    actual_suites = sorted(summary['suites'], key=by_name)
+    suites = sorted(suites, key=by_name)
     for actual_suite, expected_suite in zip(actual_suites, suites):
-      self.assertEqual(actual_suite.attrib['name'], expected_suite['name'])
-      self.assertLen(actual_suite, len(expected_suite['cases']))
-      actual_cases = sorted(actual_suite.findall('testcase'),
-                            key=lambda x: x.attrib['name'])
-      expected_cases = sorted(expected_suite['cases'], key=lambda x: x['name'])
+      self.assertEqual(actual_suite['name'], expected_suite['name'])
+      self.assertLen(actual_suite['cases'], len(expected_suite['cases']))
+      actual_cases = sorted(actual_suite['cases'], key=by_name)
+      expected_cases = sorted(expected_suite['cases'], key=by_name)
       for actual_case, expected_case in zip(actual_cases, expected_cases):
-        self.assertEqual(actual_case.attrib['name'], expected_case['name'])
-        self.assertEqual(actual_case.attrib['classname'],
-                         expected_case['classname'])
+        self.assertEqual(actual_case['name'], expected_case['name'])
+        self.assertEqual(actual_case['classname'], expected_case['classname'])
         if 'error' in expected_case:
-          actual_error = actual_case.find('error')
-          self.assertEqual(actual_error.attrib['message'],
-                           expected_case['error'])
+          self.assertEqual(actual_case.get('error'), expected_case['error'])
         if 'failure' in expected_case:
-          actual_failure = actual_case.find('failure')
-          self.assertEqual(actual_failure.attrib['message'],
-                           expected_case['failure'])
+          self.assertEqual(actual_case.get('failure'), expected_case['failure'])
 
-    return xml
+    return summary
 
   def test_set_up_module_error(self):
     self._run_test(
@@ -1235,11 +1176,10 @@ class XmlReporterFixtureTest(absltest.TestCase):
     # ...
     #
     # which we validate here.
-    out = self._run_test_and_get_xml('--test_randomize_ordering_seed=17')
+    summary = self._run_test_and_summarize_xml(
+        '--test_randomize_ordering_seed=17')
     expected_attrib = {'name': 'test_randomize_ordering_seed', 'value': '17'}
-    property_attributes = [
-        prop.attrib for prop in out.findall('./properties/property')]
-    self.assertIn(expected_attrib, property_attributes)
+    self.assertIn(expected_attrib, summary['properties'])
 
 
 if __name__ == '__main__':
@@ -21,7 +21,6 @@ import threading
 import time
 import traceback
 import unittest
-from xml.sax import saxutils
 from absl.testing import _pretty_print_reporter
 
 
@@ -34,6 +33,9 @@ _control_character_conversions = {
 
 
 _escape_xml_attr_conversions = {
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
     '"': '&quot;',
     "'": '&apos;',
     '\n': '&#xA;',
@@ -41,6 +43,7 @@ _escape_xml_attr_conversions = {
     '\r': '&#xD;',
     ' ': '&#x20;'}
 _escape_xml_attr_conversions.update(_control_character_conversions)
+_escape_xml_attr_table = str.maketrans(_escape_xml_attr_conversions)
 
 
 # When class or module level function fails, unittest/suite.py adds a
@@ -51,11 +54,11 @@ _CLASS_OR_MODULE_LEVEL_TEST_DESC_REGEX = re.compile(r'^(\w+) \((\S+)\)$')
 
 # NOTE: while saxutils.quoteattr() theoretically does the same thing; it
 # seems to often end up being too smart for it's own good not escaping properly.
-# This function is much more reliable.
+# This function is much more reliable, and escapes every character in a single
+# str.translate() pass.
 def _escape_xml_attr(content):
   """Escapes xml attributes."""
-  # Note: saxutils doesn't escape the quotes.
-  return saxutils.escape(content, _escape_xml_attr_conversions)
+  return content.translate(_escape_xml_attr_table)
 
 
 def _escape_cdata(s):